@@ -1,6 +1,5 @@
 """Document chunking module."""
 
-from src.chunking.chunker import DocumentChunker
-
-__all__ = ["DocumentChunker"]
+from src.chunking.chunker import ChunkBatch, DocumentChunker
 
+__all__ = ["ChunkBatch", "DocumentChunker"]
@@ -3,8 +3,119 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
+
+def _empty_int_array() -> np.ndarray:
+    return np.empty(0, dtype=np.int32)
+
+
+@dataclass
+class ChunkBatch:
+    """
+    Chunks stored as parallel arrays, one entry per chunk.
+
+    Per-chunk metadata dictionaries are only built by to_metadatas/to_dicts,
+    at the boundary where an API needs them.
+    """
+
+    texts: list[str] = field(default_factory=list)
+    chunk_indices: np.ndarray = field(default_factory=_empty_int_array)
+    chunk_sizes: np.ndarray = field(default_factory=_empty_int_array)
+    # None where the chunk did not come from a file
+    source_files: list[str | None] = field(default_factory=list)
+    # -1 where the chunk did not come from an indexed text string
+    source_text_indices: np.ndarray = field(default_factory=_empty_int_array)
+
+    @classmethod
+    def from_texts(cls, texts: list[str], chunk_sizes: Sequence[int]) -> ChunkBatch:
+        """
+        Build a batch of consecutive chunks from one document.
+
+        Args:
+            texts: Chunk texts in document order
+            chunk_sizes: Unstripped size of each chunk in characters
+
+        Returns:
+            ChunkBatch without source information
+        """
+        n = len(texts)
+        return cls(
+            texts=texts,
+            chunk_indices=np.arange(n, dtype=np.int32),
+            chunk_sizes=np.asarray(chunk_sizes, dtype=np.int32),
+            source_files=[None] * n,
+            source_text_indices=np.full(n, -1, dtype=np.int32),
+        )
+
+    @classmethod
+    def concat(cls, batches: Sequence[ChunkBatch]) -> ChunkBatch:
+        """
+        Concatenate batches in order.
+
+        Args:
+            batches: Batches to concatenate
+
+        Returns:
+            Single ChunkBatch holding every chunk
+        """
+        if not batches:
+            return cls()
+
+        return cls(
+            texts=[text for batch in batches for text in batch.texts],
+            chunk_indices=np.concatenate([batch.chunk_indices for batch in batches]),
+            chunk_sizes=np.concatenate([batch.chunk_sizes for batch in batches]),
+            source_files=[source for batch in batches for source in batch.source_files],
+            source_text_indices=np.concatenate(
+                [batch.source_text_indices for batch in batches]
+            ),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of chunks."""
+        return len(self.texts)
+
+    def to_metadatas(self) -> list[dict[str, Any]]:
+        """
+        Build one metadata dictionary per chunk.
+
+        Returns:
+            List of dictionaries with 'chunk_index', 'chunk_size' and, where known,
+            'source_file' or 'source_text_index'
+        """
+        metadatas: list[dict[str, Any]] = []
+        for chunk_index, chunk_size, source_file, source_text_index in zip(
+            self.chunk_indices.tolist(),
+            self.chunk_sizes.tolist(),
+            self.source_files,
+            self.source_text_indices.tolist(),
+            strict=True,
+        ):
+            metadata: dict[str, Any] = {"chunk_index": chunk_index, "chunk_size": chunk_size}
+            if source_file is not None:
+                metadata["source_file"] = source_file
+            if source_text_index >= 0:
+                metadata["source_text_index"] = source_text_index
+            metadatas.append(metadata)
+        return metadatas
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """
+        Convert to the list-of-dicts chunk representation.
+
+        Returns:
+            List of chunk dictionaries with 'text' and 'metadata' keys
+        """
+        return [
+            {"text": text, "metadata": metadata}
+            for text, metadata in zip(self.texts, self.to_metadatas(), strict=True)
+        ]
+
 
 class DocumentChunker:
     """Splits documents into chunks with configurable size and overlap."""
@@ -26,107 +137,101 @@ class DocumentChunker:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators or ["\n\n", "\n", ". ", " ", ""]
+        # Overlap may extend up to this many extra characters to start on a word
+        self._overlap_slack = chunk_overlap // 2
 
-    def chunk_text(self, text: str) -> list[dict[str, Any]]:
+        # Compile the separator alternation once; longest separators first so
+        # "\n\n" wins over "\n" at the same position
+        non_empty = sorted((sep for sep in self.separators if sep), key=len, reverse=True)
+        self._sep_pattern: re.Pattern[str] | None = (
+            re.compile("(" + "|".join(re.escape(sep) for sep in non_empty) + ")")
+            if non_empty
+            else None
+        )
+
+    def chunk_text(self, text: str) -> ChunkBatch:
         """
-        Split text into chunks with metadata.
+        Split text into chunks.
 
         Args:
             text: Input text to chunk
 
         Returns:
-            List of chunk dictionaries with 'text' and 'metadata' keys
+            ChunkBatch with one entry per chunk
         """
         if not text.strip():
-            return []
+            return ChunkBatch()
+
+        # Fast path: the whole document fits in a single chunk
+        if len(text) <= self.chunk_size:
+            return ChunkBatch.from_texts([text.strip()], [len(text)])
 
-        chunks: list[dict[str, Any]] = []
-        current_chunk = ""
-        chunk_index = 0
+        texts: list[str] = []
+        sizes: list[int] = []
+        # Parts of the chunk being built, joined only when a chunk is emitted
+        buf: list[str] = []
+        buf_len = 0
 
         # Try splitting by separators first
         parts = self._split_by_separators(text)
 
         for part in parts:
             # If adding this part would exceed chunk size
-            if len(current_chunk) + len(part) > self.chunk_size and current_chunk:
+            if buf_len + len(part) > self.chunk_size and buf:
                 # Save current chunk
-                chunks.append(
-                    {
-                        "text": current_chunk.strip(),
-                        "metadata": {
-                            "chunk_index": chunk_index,
-                            "chunk_size": len(current_chunk),
-                        },
-                    }
-                )
-                chunk_index += 1
+                current_chunk = "".join(buf)
+                texts.append(current_chunk.strip())
+                sizes.append(len(current_chunk))
 
                 # Start new chunk with overlap
                 overlap_text = self._get_overlap_text(current_chunk)
-                current_chunk = overlap_text + part
+                buf = [overlap_text, part]
+                buf_len = len(overlap_text) + len(part)
             else:
-                current_chunk += part
-
-            # If a single part exceeds chunk size, split it further
-            while len(current_chunk) > self.chunk_size:
-                # Extract chunk of exact size
-                chunk_text = current_chunk[: self.chunk_size]
-                chunks.append(
-                    {
-                        "text": chunk_text.strip(),
-                        "metadata": {
-                            "chunk_index": chunk_index,
-                            "chunk_size": len(chunk_text),
-                        },
-                    }
-                )
-                chunk_index += 1
-
-                # Keep overlap for next chunk
-                current_chunk = self._get_overlap_text(chunk_text) + current_chunk[
-                    self.chunk_size :
-                ]
+                buf.append(part)
+                buf_len += len(part)
+
+            # If a single part exceeds chunk size, split it further by slicing
+            # windows off the joined buffer without rebuilding the remainder
+            if buf_len > self.chunk_size:
+                current_chunk = "".join(buf)
+                overlap_text = ""
+                pos = 0
+                while len(overlap_text) + len(current_chunk) - pos > self.chunk_size:
+                    # Extract chunk of exact size
+                    end = pos + self.chunk_size - len(overlap_text)
+                    chunk_text = overlap_text + current_chunk[pos:end]
+                    pos = end
+                    texts.append(chunk_text.strip())
+                    sizes.append(len(chunk_text))
+
+                    # Keep overlap for next chunk
+                    overlap_text = self._get_overlap_text(chunk_text)
+
+                buf = [overlap_text, current_chunk[pos:]]
+                buf_len = len(overlap_text) + len(current_chunk) - pos
 
         # Add remaining chunk
+        current_chunk = "".join(buf)
         if current_chunk.strip():
-            chunks.append(
-                {
-                    "text": current_chunk.strip(),
-                    "metadata": {
-                        "chunk_index": chunk_index,
-                        "chunk_size": len(current_chunk),
-                    },
-                }
-            )
+            texts.append(current_chunk.strip())
+            sizes.append(len(current_chunk))
 
-        return chunks
+        return ChunkBatch.from_texts(texts, sizes)
 
     def _split_by_separators(self, text: str) -> list[str]:
-        """Split text by separators, trying each separator in order."""
-        parts = [text]
-
-        for separator in self.separators:
-            if not separator:
-                # Last separator: split by character
-                new_parts: list[str] = []
-                for part in parts:
-                    new_parts.extend(list(part))
-                return new_parts
-
-            new_parts: list[str] = []
-            for part in parts:
-                if separator in part:
-                    split_parts = part.split(separator)
-                    # Add separator back except for last part
-                    for i, split_part in enumerate(split_parts[:-1]):
-                        new_parts.append(split_part + separator)
-                    new_parts.append(split_parts[-1])
-                else:
-                    new_parts.append(part)
-            parts = new_parts
-
-        return parts
+        """
+        Split text on all non-empty separators in a single regex pass.
+
+        Separators are kept as their own parts so the original text can be
+        rebuilt by concatenation. Parts longer than chunk_size are returned
+        whole and sliced by chunk_text, which already handles the overlap;
+        this replaces the old per-character fallback for the empty separator.
+        """
+        if self._sep_pattern is None:
+            return [text]
+
+        return [part for part in self._sep_pattern.split(text) if part]
 
     def _get_overlap_text(self, text: str) -> str:
         """Extract overlap text from the end of a chunk."""
@@ -138,14 +243,16 @@ class DocumentChunker:
             return text
 
         overlap_start = len(text) - self.chunk_overlap
-        # Find last space before overlap point for word boundary
-        last_space = text.rfind(" ", 0, overlap_start)
-        if last_space > overlap_start - self.chunk_overlap // 2:
+        # Find last space before overlap point for word boundary, scanning only
+        # the window where a space would be accepted
+        window_start = max(overlap_start - self._overlap_slack + 1, 0)
+        last_space = text.rfind(" ", window_start, overlap_start)
+        if last_space > overlap_start - self._overlap_slack:
             return text[last_space + 1 :]
 
         return text[overlap_start:]
 
-    def chunk_file(self, file_path: str) -> list[dict[str, Any]]:
+    def chunk_file(self, file_path: str) -> ChunkBatch:
         """
         Read and chunk a file.
 
@@ -153,7 +260,7 @@ class DocumentChunker:
             file_path: Path to the file to chunk
 
         Returns:
-            List of chunk dictionaries
+            ChunkBatch with the file path recorded as each chunk's source
         """
         try:
             with open(file_path, "r", encoding="utf-8") as f:
@@ -164,9 +271,8 @@ class DocumentChunker:
                 text = f.read()
 
         chunks = self.chunk_text(text)
-        # Add file path to metadata
-        for chunk in chunks:
-            chunk["metadata"]["source_file"] = file_path
+        # Record file path as the source of every chunk
+        chunks.source_files = [file_path] * len(chunks)
 
         return chunks
 
@@ -1,6 +1,7 @@
 """Embedding module for vectorization."""
 
+from src.embedding.batcher import EmbeddingBatcher
+from src.embedding.cache import EmbeddingCache
 from src.embedding.embedder import Embedder
 
-__all__ = ["Embedder"]
-
+__all__ = ["Embedder", "EmbeddingBatcher", "EmbeddingCache"]
@@ -0,0 +1,148 @@
+"""Micro-batching of concurrent embedding requests."""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.embedding.embedder import Embedder
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text embedding requests into batched model calls."""
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        max_batch_size: int | None = None,
+        max_wait_ms: float | None = None,
+    ) -> None:
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+            embedder: Embedder used to encode each flushed batch
+            max_batch_size: Maximum number of texts per model call (default: 64)
+            max_wait_ms: Maximum time to wait for more texts before flushing (default: 5)
+        """
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBEDDING_MAX_BATCH", "64"))
+        self.max_wait_ms = (
+            max_wait_ms
+            if max_wait_ms is not None
+            else float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+        )
+
+        self._queue: queue.Queue[object] = queue.Queue()
+        self._closed = False
+        # Serializes submit() against close() so nothing is queued after _STOP
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, text: str) -> Future[np.ndarray]:
+        """
+        Queue a text for embedding.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            Future resolving to the float32 embedding vector
+        """
+        future: Future[np.ndarray] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingBatcher is closed")
+            self._queue.put((text, future))
+        return future
+
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        Embed a single text, blocking until its batch has been encoded.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            Float32 embedding vector
+        """
+        return self.submit(text).result()
+
+    def close(self) -> None:
+        """Flush pending requests and stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+        # Fail anything still queued behind _STOP so no caller waits forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                continue
+            _, future = item
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("EmbeddingBatcher is closed"))
+
+    def _run(self) -> None:
+        """Worker loop: collect up to max_batch_size items or max_wait_ms, then encode."""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            pending = [item]
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+            while len(pending) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                pending.append(item)
+
+            self._flush(pending)
+
+    def _flush(self, pending: list[object]) -> None:
+        """Encode a batch of pending requests and resolve their futures."""
+        # Skip requests cancelled while queued; the rest can no longer be cancelled
+        pending = [
+            (text, future) for text, future in pending if future.set_running_or_notify_cancel()
+        ]
+        if not pending:
+            return
+
+        texts = [text for text, _ in pending]
+        futures = [future for _, future in pending]
+
+        try:
+            embeddings = self.embedder.embed_batch(texts)
+        except BaseException as e:
+            # Never let an error escape and kill the worker thread
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, embedding in zip(futures, embeddings, strict=True):
+            future.set_result(embedding)
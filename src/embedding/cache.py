@@ -0,0 +1,104 @@
+"""Persistent on-disk cache of embeddings keyed by content hash."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from hashlib import blake2b
+
+import numpy as np
+
+# SQLite caps the number of bound parameters per statement
+_MAX_SQL_VARIABLES = 900
+
+
+class EmbeddingCache:
+    """SQLite-backed store mapping text content hashes to float32 embeddings."""
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_path: str | None = None,
+        backend: str = "torch",
+        dtype: str = "fp32",
+    ) -> None:
+        """
+        Initialize the embedding cache.
+
+        Args:
+            model_name: Name of the model the embeddings belong to
+            cache_path: Root directory of the cache. Defaults to ./data/embedding_cache
+            backend: Inference runtime that produced the embeddings
+            dtype: Model weight precision that produced the embeddings
+
+        Each (model_name, backend, dtype) combination gets its own cache directory,
+        since e.g. a quantized model yields different vectors for the same text.
+        """
+        root = cache_path or os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache")
+        self.cache_dir = os.path.join(
+            root, f"{model_name.replace('/', '__')}__{backend}__{dtype}"
+        )
+
+        # Create directory if it doesn't exist
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            os.path.join(self.cache_dir, "embeddings.sqlite3"), check_same_thread=False
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Return the content-hash key for a text."""
+        return blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            keys: Content-hash keys to look up
+
+        Returns:
+            Mapping of found keys to float32 embedding vectors; missing keys are omitted
+        """
+        found: dict[str, np.ndarray] = {}
+        for start in range(0, len(keys), _MAX_SQL_VARIABLES):
+            batch = keys[start : start + _MAX_SQL_VARIABLES]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch,
+            )
+            for key, vector in rows:
+                found[key] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, keys: list[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings, keeping any existing entries for the same keys.
+
+        Args:
+            keys: Content-hash keys, one per embedding row
+            embeddings: Embedding matrix of shape (len(keys), dim)
+        """
+        if len(keys) != len(embeddings):
+            raise ValueError("Number of keys must match number of embeddings")
+
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, vector) VALUES (?, ?)",
+            ((key, row.tobytes()) for key, row in zip(keys, embeddings, strict=True)),
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        """Return the number of cached embeddings."""
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
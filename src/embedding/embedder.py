@@ -2,52 +2,183 @@
 
 from __future__ import annotations
 
+import logging
 import os
-from typing import Any
+import threading
+from collections import OrderedDict
+from typing import Any, Literal
 
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+logger = logging.getLogger(__name__)
+
+EmbeddingBackend = Literal["torch", "onnx", "openvino"]
+EmbeddingDtype = Literal["fp32", "fp16", "int8"]
+
+# Dynamically quantized ONNX export that sentence-transformers publishes
+# alongside its models; uses VNNI int8 dot products on recent x86 CPUs
+_INT8_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Loaded models shared by every Embedder in the process, keyed by
+# (model_name, backend, dtype)
+_MODEL_CACHE: dict[tuple[str, str, str], SentenceTransformer] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
 
 class Embedder:
     """Generates embeddings for text using sentence transformers."""
 
-    def __init__(self, model_name: str | None = None) -> None:
+    def __init__(
+        self,
+        model_name: str | None = None,
+        cache_size: int | None = None,
+        batch_size: int | None = None,
+        backend: EmbeddingBackend | None = None,
+        dtype: EmbeddingDtype | None = None,
+    ) -> None:
         """
         Initialize the embedder.
 
         Args:
             model_name: Name of the sentence transformer model to use.
                        Defaults to 'sentence-transformers/all-MiniLM-L6-v2'
+            cache_size: Maximum number of single-text embeddings kept in the
+                       in-process LRU cache (default: 4096, 0 disables caching)
+            batch_size: Mini-batch size passed to the model (default: 32)
+            backend: Inference runtime, one of 'torch', 'onnx' or 'openvino'
+                    (default: 'torch'). 'onnx' and 'openvino' need the matching
+                    sentence-transformers extra installed.
+            dtype: Model weight precision, one of 'fp32', 'fp16' or 'int8'
+                  (default: 'fp32'). 'fp16' needs the torch backend on CUDA and
+                  falls back to 'fp32' otherwise; 'int8' loads the dynamically
+                  quantized ONNX model.
+                  Embeddings are always returned as float32.
         """
         self.model_name = (
             model_name
             or os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
         )
+        self.cache_size = (
+            cache_size
+            if cache_size is not None
+            else int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+        )
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.dtype = dtype or os.getenv("EMBEDDING_DTYPE", "fp32")
+        if self.backend not in ("torch", "onnx", "openvino"):
+            raise ValueError(f"Unsupported embedding backend: {self.backend}")
+        if self.dtype not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"Unsupported embedding dtype: {self.dtype}")
+        if self.dtype == "int8" and self.backend != "onnx":
+            raise ValueError("int8 embeddings require the 'onnx' backend")
+        # Half precision only pays off where fp16 kernels exist; record what
+        # actually runs so the model and embedding cache keys stay truthful
+        if self.dtype == "fp16" and not (self.backend == "torch" and torch.cuda.is_available()):
+            logger.warning(
+                "fp16 embeddings need the torch backend on a CUDA device; using fp32 instead"
+            )
+            self.dtype = "fp32"
+        # Embeddings are deterministic for a fixed model, so cached entries
+        # stay valid for the lifetime of the process.
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Guards the cache and its counters; the model call itself runs unlocked
+        self._cache_lock = threading.Lock()
+        # Loaded lazily on first use and shared across instances
         self.model: SentenceTransformer | None = None
-        self._load_model()
 
     def _load_model(self) -> None:
-        """Load the sentence transformer model."""
+        """Load the sentence transformer model, reusing it if already loaded in this process."""
+        if self.model is not None:
+            return
+
+        key = (self.model_name, self.backend, self.dtype)
+        with _MODEL_CACHE_LOCK:
+            model = _MODEL_CACHE.get(key)
+            if model is None:
+                model = self._create_model()
+                _MODEL_CACHE[key] = model
+        self.model = model
+
+    def _create_model(self) -> SentenceTransformer:
+        """Construct the sentence transformer model for this embedder's settings."""
+        num_threads = os.getenv("EMBEDDING_NUM_THREADS")
+        if num_threads:
+            torch.set_num_threads(int(num_threads))
+
+        model_kwargs: dict[str, Any] = {}
+        if self.dtype == "int8":
+            model_kwargs["file_name"] = _INT8_ONNX_FILE
+
+        model = SentenceTransformer(
+            self.model_name,
+            backend=self.backend,
+            model_kwargs=model_kwargs or None,
+        )
+
+        if self.dtype == "fp16":
+            model = model.half()
+
+        return model
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode a list of texts into a float32 matrix of normalized embeddings."""
         if self.model is None:
-            self.model = SentenceTransformer(self.model_name)
+            self._load_model()
+
+        # SentenceTransformer.encode length-sorts texts internally for every
+        # backend, so mini-batches are already padded to similar lengths
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return embeddings.astype(np.float32, copy=False)
 
-    def embed_text(self, text: str) -> list[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
 
+        Results are served from an LRU cache when the same text has been
+        embedded before.
+
         Args:
             text: Input text to embed
 
         Returns:
-            Embedding vector as a list of floats
+            Read-only float32 embedding vector of shape (dim,)
         """
-        if self.model is None:
-            self._load_model()
-
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
-
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+                self._cache_hits += 1
+                return embedding
+
+            self._cache_misses += 1
+
+        # Route through the batch path: a one-element list avoids the extra
+        # single-string dispatch in sentence-transformers.
+        embedding = self._encode([text])[0]
+        # Cached arrays are shared between callers, so guard them against mutation
+        embedding.flags.writeable = False
+
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._cache[text] = embedding
+                self._cache.move_to_end(text)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return embedding
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
         """
         Generate embeddings for multiple texts.
 
@@ -55,13 +186,31 @@ class Embedder:
             texts: List of texts to embed
 
         Returns:
-            List of embedding vectors
+            Float32 embedding matrix of shape (len(texts), dim)
         """
-        if self.model is None:
-            self._load_model()
+        return self._encode(texts)
+
+    def get_cache_info(self) -> dict[str, Any]:
+        """
+        Get statistics about the single-text embedding cache.
 
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+        Returns:
+            Dictionary with 'hits', 'misses', 'size' and 'max_size'
+        """
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+            }
+
+    def clear_cache(self) -> None:
+        """Drop all cached embeddings and reset hit/miss counters."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
 
     def get_embedding_dimension(self) -> int:
         """
@@ -73,7 +222,9 @@ class Embedder:
         if self.model is None:
             self._load_model()
 
-        # Get dimension by encoding a dummy text
-        dummy_embedding = self.model.encode("dummy", convert_to_numpy=True)
-        return len(dummy_embedding)
-
+        # Read the dimension from the model config; only fall back to encoding
+        # a dummy text for models that don't declare it
+        dimension = self.model.get_sentence_embedding_dimension()
+        if dimension is None:
+            dimension = len(self._encode(["dummy"])[0])
+        return dimension
@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import io
+import json
 import os
+from collections.abc import Iterator
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class LMStudioClient:
@@ -23,6 +28,16 @@ class LMStudioClient:
         self.api_key = api_key or os.getenv("LM_STUDIO_API_KEY", "")
         self.chat_endpoint = f"{self.base_url}/v1/chat/completions"
 
+        # Reuse one session so calls share pooled keep-alive connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.1),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
     def generate(
         self,
         messages: list[dict[str, str]],
@@ -44,6 +59,37 @@ class LMStudioClient:
         Returns:
             Generated text response
         """
+        return "".join(
+            self.generate_stream(
+                messages=messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **kwargs,
+            )
+        )
+
+    def generate_stream(
+        self,
+        messages: list[dict[str, str]],
+        model: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """
+        Generate text using LM Studio, yielding content as it is produced.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content' keys
+            model: Model name (optional, uses default if not specified)
+            temperature: Sampling temperature (0.0 to 2.0)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Additional parameters for the API
+
+        Yields:
+            Pieces of generated text in the order they arrive
+        """
         headers = {
             "Content-Type": "application/json",
         }
@@ -56,26 +102,63 @@ class LMStudioClient:
             "temperature": temperature,
             "max_tokens": max_tokens,
             **kwargs,
+            "stream": True,
         }
 
         if model:
             payload["model"] = model
 
         try:
-            response = requests.post(
+            with self._session.post(
                 self.chat_endpoint,
                 json=payload,
                 headers=headers,
                 timeout=120,
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+                stream=True,
+            ) as response:
+                response.raise_for_status()
+
+                content_type = response.headers.get("Content-Type", "")
+                if not content_type.startswith("text/event-stream"):
+                    # Server ignored "stream" and answered with a single JSON body
+                    result = response.json()
+                    self._raise_for_error(result)
+                    yield result["choices"][0]["message"]["content"]
+                    return
+
+                # Server-sent events: one "data: {...}" line per chunk
+                for line in response.iter_lines():
+                    if not line.startswith(b"data:"):
+                        continue
+
+                    data = line[len(b"data:") :].strip()
+                    if data == b"[DONE]":
+                        break
+
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError as e:
+                        raise RuntimeError(f"LM Studio API returned invalid JSON: {e}") from e
+
+                    self._raise_for_error(chunk)
+                    if not chunk.get("choices"):
+                        continue
+                    content = chunk["choices"][0].get("delta", {}).get("content")
+                    if content:
+                        yield content
 
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"LM Studio API request failed: {e}") from e
 
+    @staticmethod
+    def _raise_for_error(result: dict[str, Any]) -> None:
+        """Raise if an API response or stream event reports an error."""
+        if "error" in result:
+            error = result["error"]
+            if isinstance(error, dict):
+                error = error.get("message", error)
+            raise RuntimeError(f"LM Studio API request failed: {error}")
+
     def generate_with_context(
         self,
         query: str,
@@ -95,20 +178,48 @@ class LMStudioClient:
         Returns:
             Generated response
         """
-        # Build context from chunks
-        context = "\n\n".join(
-            [f"Context {i+1}:\n{chunk}" for i, chunk in enumerate(context_chunks)]
-        )
+        messages = self._build_context_messages(query, context_chunks, system_prompt)
+        return self.generate(messages=messages, **kwargs)
 
-        # Construct prompt
-        user_prompt = f"""Based on the following context, please answer the question.
+    def generate_with_context_stream(
+        self,
+        query: str,
+        context_chunks: list[str],
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> Iterator[str]:
+        """
+        Stream a response generated with retrieved context chunks.
 
-Context:
-{context}
+        Args:
+            query: User query
+            context_chunks: List of retrieved context chunks
+            system_prompt: Optional system prompt
+            **kwargs: Additional generation parameters
 
-Question: {query}
+        Returns:
+            Iterator over pieces of the generated response in the order they arrive
+        """
+        messages = self._build_context_messages(query, context_chunks, system_prompt)
+        return self.generate_stream(messages=messages, **kwargs)
 
-Answer:"""
+    def _build_context_messages(
+        self,
+        query: str,
+        context_chunks: list[str],
+        system_prompt: str | None = None,
+    ) -> list[dict[str, str]]:
+        """Build the chat messages for a query answered from context chunks."""
+        # Construct prompt in one buffer instead of joining per-chunk strings
+        buf = io.StringIO()
+        buf.write("Based on the following context, please answer the question.\n\nContext:\n")
+        for i, chunk in enumerate(context_chunks, 1):
+            if i > 1:
+                buf.write("\n\n")
+            buf.write(f"Context {i}:\n")
+            buf.write(chunk)
+        buf.write(f"\n\nQuestion: {query}\n\nAnswer:")
+        user_prompt = buf.getvalue()
 
         messages: list[dict[str, str]] = []
 
@@ -117,7 +228,7 @@ Answer:"""
 
         messages.append({"role": "user", "content": user_prompt})
 
-        return self.generate(messages=messages, **kwargs)
+        return messages
 
     def check_health(self) -> bool:
         """
@@ -128,7 +239,7 @@ Answer:"""
         """
         try:
             # Try to list models endpoint
-            response = requests.get(
+            response = self._session.get(
                 f"{self.base_url}/v1/models",
                 timeout=5,
             )
@@ -136,3 +247,6 @@ Answer:"""
         except requests.exceptions.RequestException:
             return False
 
+    def close(self) -> None:
+        """Close the underlying HTTP session and its pooled connections."""
+        self._session.close()
@@ -77,48 +77,52 @@ def main() -> None:
         top_k=args.top_k if hasattr(args, "top_k") else None,
     )
 
-    # Execute command
-    if args.command == "index":
-        # Validate files exist
-        for file_path in args.files:
-            if not Path(file_path).exists():
-                print(f"Error: File not found: {file_path}", file=sys.stderr)
-                sys.exit(1)
-
-        print(f"Indexing {len(args.files)} file(s)...")
-        count = rag.index_documents(file_paths=args.files)
-        print(f"✓ Indexed {count} chunks")
-
-    elif args.command == "query":
-        # Check if LM Studio is accessible
-        if not rag.generator.check_health():
-            print(
-                "Warning: LM Studio may not be running. Make sure it's started on",
-                rag.generator.base_url,
-                file=sys.stderr,
+    try:
+        # Execute command
+        if args.command == "index":
+            # Validate files exist
+            for file_path in args.files:
+                if not Path(file_path).exists():
+                    print(f"Error: File not found: {file_path}", file=sys.stderr)
+                    sys.exit(1)
+
+            print(f"Indexing {len(args.files)} file(s)...")
+            count = rag.index_documents(file_paths=args.files)
+            print(f"✓ Indexed {count} chunks")
+
+        elif args.command == "query":
+            # Check if LM Studio is accessible
+            if not rag.generator.check_health():
+                print(
+                    "Warning: LM Studio may not be running. Make sure it's started on",
+                    rag.generator.base_url,
+                    file=sys.stderr,
+                )
+
+            print(f"Querying: {args.query}\n")
+            result = rag.query_stream(
+                query=args.query,
+                temperature=args.temperature,
+                max_tokens=args.max_tokens,
             )
 
-        print(f"Querying: {args.query}\n")
-        result = rag.query(
-            query=args.query,
-            temperature=args.temperature,
-            max_tokens=args.max_tokens,
-        )
+            print("Answer:")
+            for token in result["answer_stream"]:
+                print(token, end="", flush=True)
+            print()
+            print(f"\nRetrieved {result['metadata']['retrieved_count']} context chunks")
 
-        print("Answer:")
-        print(result["answer"])
-        print(f"\nRetrieved {result['metadata']['retrieved_count']} context chunks")
-
-    elif args.command == "stats":
-        stats = rag.get_stats()
-        print("RAG System Statistics:")
-        print(f"  Total chunks indexed: {stats['total_chunks']}")
-        print(f"  Embedding model: {stats['embedding_model']}")
-        print(f"  Chunk size: {stats['chunk_size']}")
-        print(f"  Chunk overlap: {stats['chunk_overlap']}")
-        print(f"  Top-K retrieval: {stats['top_k']}")
+        elif args.command == "stats":
+            stats = rag.get_stats()
+            print("RAG System Statistics:")
+            print(f"  Total chunks indexed: {stats['total_chunks']}")
+            print(f"  Embedding model: {stats['embedding_model']}")
+            print(f"  Chunk size: {stats['chunk_size']}")
+            print(f"  Chunk overlap: {stats['chunk_overlap']}")
+            print(f"  Top-K retrieval: {stats['top_k']}")
+    finally:
+        rag.close()
 
 
 if __name__ == "__main__":
     main()
-
@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from src.chunking import DocumentChunker
-from src.embedding import Embedder
+import numpy as np
+
+from src.chunking import ChunkBatch, DocumentChunker
+from src.embedding import Embedder, EmbeddingCache
 from src.generator import LMStudioClient
 from src.retriever import Retriever
 from src.vectorstore import ChromaVectorStore
 
+logger = logging.getLogger(__name__)
+
 
 class RAGOrchestrator:
     """Orchestrates the complete RAG pipeline."""
@@ -24,6 +30,7 @@ class RAGOrchestrator:
         db_path: str | None = None,
         collection_name: str | None = None,
         lm_studio_url: str | None = None,
+        embedding_cache_path: str | None = None,
     ) -> None:
         """
         Initialize the RAG orchestrator.
@@ -36,6 +43,7 @@ class RAGOrchestrator:
             db_path: Path to ChromaDB storage
             collection_name: ChromaDB collection name
             lm_studio_url: LM Studio API URL
+            embedding_cache_path: Root directory of the persistent embedding cache
         """
         # Initialize components
         self.chunker = DocumentChunker(
@@ -46,6 +54,9 @@ class RAGOrchestrator:
         )
 
         self.embedder = Embedder(model_name=embedding_model)
+        # Opened on first indexing so query/stats runs don't create cache files
+        self.embedding_cache_path = embedding_cache_path
+        self.embedding_cache: EmbeddingCache | None = None
 
         self.vector_store = ChromaVectorStore(
             db_path=db_path,
@@ -56,6 +67,8 @@ class RAGOrchestrator:
             vector_store=self.vector_store,
             embedder=self.embedder,
             top_k=top_k or int(os.getenv("TOP_K_CHUNKS", "3")),
+            oversample=int(os.getenv("RETRIEVAL_OVERSAMPLE", "1")),
+            mmr_lambda=float(os.environ["MMR_LAMBDA"]) if os.getenv("MMR_LAMBDA") else None,
         )
 
         self.generator = LMStudioClient(base_url=lm_studio_url)
@@ -75,36 +88,47 @@ class RAGOrchestrator:
         Returns:
             Number of chunks indexed
         """
-        all_chunks: list[dict[str, Any]] = []
+        batches: list[ChunkBatch] = []
 
-        # Process files
+        # Process files, overlapping file reads across a thread pool;
+        # map keeps results in input order
         if file_paths:
-            for file_path in file_paths:
-                chunks = self.chunker.chunk_file(file_path)
-                all_chunks.extend(chunks)
+            max_workers = min(32, (os.cpu_count() or 1) * 4, len(file_paths))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                batches.extend(executor.map(self.chunker.chunk_file, file_paths))
 
         # Process texts
         if texts:
             for i, text in enumerate(texts):
                 chunks = self.chunker.chunk_text(text)
                 # Add source identifier
-                for chunk in chunks:
-                    chunk["metadata"]["source_text_index"] = i
-                all_chunks.extend(chunks)
+                chunks.source_text_indices[:] = i
+                batches.append(chunks)
 
+        all_chunks = ChunkBatch.concat(batches)
         if not all_chunks:
             return 0
 
-        # Generate embeddings
-        chunk_texts = [chunk["text"] for chunk in all_chunks]
-        embeddings = self.embedder.embed_batch(chunk_texts)
+        # Generate embeddings, embedding each distinct text only once
+        chunk_texts = all_chunks.texts
+        unique: dict[str, int] = {}
+        rev = [unique.setdefault(text, len(unique)) for text in chunk_texts]
+        embeddings = self._embed_with_cache(list(unique))
+        if len(unique) < len(chunk_texts):
+            logger.info(
+                "Embedding %d unique of %d chunks (%.1f%% duplicates)",
+                len(unique),
+                len(chunk_texts),
+                100.0 * (len(chunk_texts) - len(unique)) / len(chunk_texts),
+            )
+            embeddings = embeddings[np.asarray(rev)]
 
-        # Prepare metadata and IDs
-        metadatas = [chunk["metadata"] for chunk in all_chunks]
+        # Prepare IDs, and per-chunk metadata only now that Chroma needs dicts
         ids = [
-            f"chunk_{i}_{metadatas[i].get('chunk_index', i)}"
-            for i in range(len(all_chunks))
+            f"chunk_{i}_{chunk_index}"
+            for i, chunk_index in enumerate(all_chunks.chunk_indices.tolist())
         ]
+        metadatas = all_chunks.to_metadatas()
 
         # Add to vector store
         self.vector_store.add_documents(
@@ -116,6 +140,46 @@ class RAGOrchestrator:
 
         return len(all_chunks)
 
+    def _embed_with_cache(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts, reusing embeddings from the persistent cache where possible.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Float32 embedding matrix of shape (len(texts), dim) in input order
+        """
+        if self.embedding_cache is None:
+            self.embedding_cache = EmbeddingCache(
+                model_name=self.embedder.model_name,
+                cache_path=self.embedding_cache_path,
+                backend=self.embedder.backend,
+                dtype=self.embedder.dtype,
+            )
+
+        keys = [EmbeddingCache.make_key(text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+
+        uncached = [i for i, key in enumerate(keys) if key not in cached]
+        new_embeddings = None
+        if uncached:
+            new_embeddings = self.embedder.embed_batch([texts[i] for i in uncached])
+            self.embedding_cache.put_many([keys[i] for i in uncached], new_embeddings)
+
+        if new_embeddings is not None and len(uncached) == len(texts):
+            return new_embeddings
+
+        dim = new_embeddings.shape[1] if new_embeddings is not None else len(cached[keys[0]])
+        embeddings = np.empty((len(texts), dim), dtype=np.float32)
+        for i, key in enumerate(keys):
+            if key in cached:
+                embeddings[i] = cached[key]
+        if new_embeddings is not None:
+            embeddings[uncached] = new_embeddings
+
+        return embeddings
+
     def query(
         self,
         query: str,
@@ -135,12 +199,47 @@ class RAGOrchestrator:
         Returns:
             Dictionary with 'answer', 'context_chunks', and 'metadata'
         """
+        result = self.query_stream(
+            query=query,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+        return {
+            "answer": "".join(result["answer_stream"]),
+            "context_chunks": result["context_chunks"],
+            "metadata": result["metadata"],
+        }
+
+    def query_stream(
+        self,
+        query: str,
+        system_prompt: str | None = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500,
+    ) -> dict[str, Any]:
+        """
+        Query the RAG system, streaming the generated answer.
+
+        Retrieval happens eagerly; generation starts when 'answer_stream' is iterated.
+
+        Args:
+            query: User query
+            system_prompt: Optional system prompt for the generator
+            temperature: Generation temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Dictionary with 'answer_stream' (iterator of text pieces),
+            'context_chunks', and 'metadata'
+        """
         # Retrieve relevant chunks
         retrieved_chunks = self.retriever.retrieve_with_scores(query)
 
         if not retrieved_chunks:
             return {
-                "answer": "No relevant context found in the knowledge base.",
+                "answer_stream": iter(["No relevant context found in the knowledge base."]),
                 "context_chunks": [],
                 "metadata": {"retrieved_count": 0},
             }
@@ -148,8 +247,7 @@ class RAGOrchestrator:
         # Extract context texts
         context_texts = [chunk["text"] for chunk in retrieved_chunks]
 
-        # Generate response
-        answer = self.generator.generate_with_context(
+        answer_stream = self.generator.generate_with_context_stream(
             query=query,
             context_chunks=context_texts,
             system_prompt=system_prompt,
@@ -158,7 +256,7 @@ class RAGOrchestrator:
         )
 
         return {
-            "answer": answer,
+            "answer_stream": answer_stream,
             "context_chunks": retrieved_chunks,
             "metadata": {
                 "retrieved_count": len(retrieved_chunks),
@@ -173,11 +271,20 @@ class RAGOrchestrator:
         Returns:
             Dictionary with statistics
         """
+        cache_info = self.embedder.get_cache_info()
         return {
             "total_chunks": self.vector_store.get_collection_count(),
             "embedding_model": self.embedder.model_name,
             "chunk_size": self.chunker.chunk_size,
             "chunk_overlap": self.chunker.chunk_overlap,
             "top_k": self.retriever.top_k,
+            "embedding_cache_hits": cache_info["hits"],
+            "embedding_cache_misses": cache_info["misses"],
         }
 
+    def close(self) -> None:
+        """Release the embedding cache database and the LM Studio HTTP session."""
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+            self.embedding_cache = None
+        self.generator.close()
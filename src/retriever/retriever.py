@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
+
 from src.embedding import Embedder
 from src.vectorstore import ChromaVectorStore
 
@@ -16,6 +18,8 @@ class Retriever:
         vector_store: ChromaVectorStore,
         embedder: Embedder,
         top_k: int = 3,
+        oversample: int = 1,
+        mmr_lambda: float | None = None,
     ) -> None:
         """
         Initialize the retriever.
@@ -24,10 +28,16 @@ class Retriever:
             vector_store: ChromaDB vector store instance
             embedder: Embedder instance for query vectorization
             top_k: Number of top chunks to retrieve
+            oversample: Fetch top_k * oversample candidates and rerank them
+                locally by exact cosine similarity (default: 1, no reranking)
+            mmr_lambda: If set, rerank candidates with maximal marginal relevance,
+                trading relevance (1.0) against diversity (0.0)
         """
         self.vector_store = vector_store
         self.embedder = embedder
         self.top_k = top_k
+        self.oversample = max(1, oversample)
+        self.mmr_lambda = mmr_lambda
 
     def retrieve(self, query: str) -> list[dict[str, Any]]:
         """
@@ -42,13 +52,61 @@ class Retriever:
         # Embed the query
         query_embedding = self.embedder.embed_text(query)
 
-        # Search in vector store
-        results = self.vector_store.search(
+        if self.oversample == 1 and self.mmr_lambda is None:
+            # Search in vector store
+            return self.vector_store.search(
+                query_embedding=query_embedding,
+                top_k=self.top_k,
+            )
+
+        candidates, candidate_embeddings = self.vector_store.search_with_embeddings(
             query_embedding=query_embedding,
-            top_k=self.top_k,
+            top_k=self.top_k * self.oversample,
         )
+        if not candidates:
+            return candidates
 
-        return results
+        order = self._rerank(candidate_embeddings, np.asarray(query_embedding, np.float32))
+        return [candidates[i] for i in order]
+
+    def _rerank(self, candidate_embeddings: np.ndarray, query_embedding: np.ndarray) -> list[int]:
+        """
+        Order candidates by cosine similarity, optionally diversified with MMR.
+
+        Args:
+            candidate_embeddings: Normalized candidate matrix of shape (n, dim)
+            query_embedding: Normalized query vector of shape (dim,)
+
+        Returns:
+            Indices of at most top_k selected candidates, best first
+        """
+        # One gemv scores every candidate against the query
+        scores = candidate_embeddings @ query_embedding
+        k = min(self.top_k, len(scores))
+
+        if self.mmr_lambda is None:
+            return np.argsort(-scores, kind="stable")[:k].tolist()
+
+        selected: list[int] = []
+        # Highest similarity of each candidate to anything already selected
+        redundancy = np.full(len(scores), -np.inf, dtype=np.float32)
+        available = np.ones(len(scores), dtype=bool)
+        for _ in range(k):
+            if selected:
+                mmr = self.mmr_lambda * scores - (1.0 - self.mmr_lambda) * redundancy
+            else:
+                mmr = scores.copy()
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            available[best] = False
+            np.maximum(
+                redundancy,
+                candidate_embeddings @ candidate_embeddings[best],
+                out=redundancy,
+            )
+
+        return selected
 
     def retrieve_with_scores(self, query: str) -> list[dict[str, Any]]:
         """
@@ -58,11 +116,11 @@ class Retriever:
             query: Query text
 
         Returns:
-            List of chunks with similarity scores (lower distance = more similar)
+            List of chunks with similarity scores (higher similarity = more similar)
         """
         results = self.retrieve(query)
 
-        # Convert distance to similarity score (1 - distance for cosine similarity)
+        # The collection uses cosine distance, so similarity = 1 - distance
         for result in results:
             result["similarity"] = 1.0 - result.get("distance", 0.0)
 
@@ -1,6 +1,5 @@
 """Vector store module for ChromaDB integration."""
 
-from src.vectorstore.chroma_store import ChromaVectorStore
-
-__all__ = ["ChromaVectorStore"]
+from src.vectorstore.chroma_store import ChromaVectorStore, HNSWConfig
 
+__all__ = ["ChromaVectorStore", "HNSWConfig"]
@@ -2,12 +2,41 @@
 
 from __future__ import annotations
 
+import logging
 import os
+from dataclasses import dataclass
 from typing import Any
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HNSWConfig:
+    """HNSW index parameters; unset fields fall back to the HNSW_* env vars."""
+
+    m: int | None = None
+    ef_construction: int | None = None
+    ef_search: int | None = None
+
+    def to_metadata(self) -> dict[str, int]:
+        """
+        Build the Chroma collection metadata entries for these parameters.
+
+        Returns:
+            Dictionary with 'hnsw:M', 'hnsw:construction_ef' and 'hnsw:search_ef'
+        """
+        return {
+            "hnsw:M": self.m or int(os.getenv("HNSW_M", "32")),
+            "hnsw:construction_ef": (
+                self.ef_construction or int(os.getenv("HNSW_EF_CONSTRUCTION", "200"))
+            ),
+            "hnsw:search_ef": self.ef_search or int(os.getenv("HNSW_EF_SEARCH", "100")),
+        }
+
 
 class ChromaVectorStore:
     """ChromaDB-based vector store for storing and retrieving embeddings."""
@@ -16,19 +45,31 @@ class ChromaVectorStore:
         self,
         db_path: str | None = None,
         collection_name: str | None = None,
+        *,
+        hnsw: HNSWConfig | None = None,
+        write_batch_size: int | None = None,
     ) -> None:
         """
         Initialize the ChromaDB vector store.
 
+        HNSW parameters are only applied when the collection is created; an
+        existing collection keeps the settings its index was built with.
+
         Args:
             db_path: Path to store ChromaDB data. Defaults to ./data/chroma_db
             collection_name: Name of the collection. Defaults to 'rag_documents'
+            hnsw: HNSW index parameters (defaults: M=32, construction_ef=200,
+                search_ef=100)
+            write_batch_size: Maximum number of documents per collection.add call
+                (default: 1024)
         """
         self.db_path = db_path or os.getenv("CHROMA_DB_PATH", "./data/chroma_db")
         self.collection_name = (
             collection_name or os.getenv("CHROMA_COLLECTION_NAME", "rag_documents")
         )
 
+        self.write_batch_size = write_batch_size or int(os.getenv("CHROMA_WRITE_BATCH", "1024"))
+
         # Create directory if it doesn't exist
         os.makedirs(self.db_path, exist_ok=True)
 
@@ -37,15 +78,64 @@ class ChromaVectorStore:
             path=self.db_path, settings=Settings(anonymized_telemetry=False)
         )
 
+        # Embeddings are L2-normalized, so cosine distance is the matching metric.
+        # Only applied when the collection is created, see _open_collection.
+        self.collection_metadata: dict[str, Any] = {
+            "hnsw:space": "cosine",
+            **(hnsw or HNSWConfig()).to_metadata(),
+        }
+
         # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name
-        )
+        self.collection = self._open_collection()
+
+    def _open_collection(self) -> chromadb.Collection:
+        """
+        Open the collection, creating it with collection_metadata if it doesn't exist.
+
+        Metadata is never passed for an existing collection: get_or_create_collection
+        would overwrite the stored metadata while the HNSW index keeps the settings
+        it was built with.
+        """
+        existing = {
+            collection if isinstance(collection, str) else collection.name
+            for collection in self.client.list_collections()
+        }
+        if self.collection_name not in existing:
+            return self.client.create_collection(
+                name=self.collection_name,
+                metadata=self.collection_metadata,
+            )
+
+        collection = self.client.get_collection(name=self.collection_name)
+        stored = collection.metadata or {}
+        space = stored.get("hnsw:space", "l2")
+        if space != self.collection_metadata["hnsw:space"]:
+            logger.warning(
+                "Collection '%s' uses '%s' distance instead of '%s'; similarity scores "
+                "will be wrong. Delete the collection and re-index to fix this.",
+                self.collection_name,
+                space,
+                self.collection_metadata["hnsw:space"],
+            )
+
+        ignored = [
+            key
+            for key, value in self.collection_metadata.items()
+            if key != "hnsw:space" and key in stored and stored[key] != value
+        ]
+        if ignored:
+            logger.warning(
+                "Collection '%s' was built with different %s; the configured values are "
+                "ignored until the collection is deleted and re-indexed.",
+                self.collection_name,
+                ", ".join(ignored),
+            )
+        return collection
 
     def add_documents(
         self,
         texts: list[str],
-        embeddings: list[list[float]],
+        embeddings: np.ndarray | list[list[float]],
         metadatas: list[dict[str, Any]] | None = None,
         ids: list[str] | None = None,
     ) -> None:
@@ -54,7 +144,7 @@ class ChromaVectorStore:
 
         Args:
             texts: List of text chunks
-            embeddings: List of embedding vectors
+            embeddings: Embedding matrix of shape (n, dim) or list of embedding vectors
             metadatas: Optional list of metadata dictionaries
             ids: Optional list of document IDs. If not provided, will be auto-generated
         """
@@ -71,17 +161,20 @@ class ChromaVectorStore:
         if len(ids) != len(texts):
             raise ValueError("Number of IDs must match number of texts")
 
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids,
-        )
+        # Add to collection in bounded batches to keep peak memory flat;
+        # slicing an ndarray yields a view, so no embeddings are copied here
+        for start in range(0, len(texts), self.write_batch_size):
+            end = start + self.write_batch_size
+            self.collection.add(
+                embeddings=embeddings[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end],
+            )
 
     def search(
         self,
-        query_embedding: list[float],
+        query_embedding: np.ndarray | list[float],
         top_k: int = 3,
         filter_metadata: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
@@ -96,13 +189,50 @@ class ChromaVectorStore:
         Returns:
             List of dictionaries containing 'text', 'metadata', 'distance', and 'id'
         """
+        results, _ = self._query(query_embedding, top_k, filter_metadata, False)
+        return results
+
+    def search_with_embeddings(
+        self,
+        query_embedding: np.ndarray | list[float],
+        top_k: int = 3,
+        filter_metadata: dict[str, Any] | None = None,
+    ) -> tuple[list[dict[str, Any]], np.ndarray]:
+        """
+        Search for similar documents and return their stored embeddings.
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of top results to return
+            filter_metadata: Optional metadata filter
+
+        Returns:
+            Tuple of the result dictionaries (as returned by search) and a float32
+            matrix of shape (len(results), dim) holding their embeddings in the same order
+        """
+        return self._query(query_embedding, top_k, filter_metadata, True)
+
+    def _query(
+        self,
+        query_embedding: np.ndarray | list[float],
+        top_k: int,
+        filter_metadata: dict[str, Any] | None,
+        include_embeddings: bool,
+    ) -> tuple[list[dict[str, Any]], np.ndarray]:
+        """Run a collection query and format its results."""
         # Build where clause if filter provided
         where = filter_metadata if filter_metadata else None
 
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            # A (1, dim) matrix; chromadb only accepts ndarrays at the top level
+            query_embeddings=np.atleast_2d(np.asarray(query_embedding, dtype=np.float32)),
             n_results=top_k,
             where=where,
+            include=include,
         )
 
         # Format results
@@ -118,15 +248,18 @@ class ChromaVectorStore:
                     }
                 )
 
-        return formatted_results
+        if include_embeddings and formatted_results:
+            embeddings = np.asarray(results["embeddings"][0], dtype=np.float32)
+        else:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+
+        return formatted_results, embeddings
 
     def delete_collection(self) -> None:
         """Delete the entire collection."""
         self.client.delete_collection(name=self.collection_name)
         # Recreate empty collection
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name
-        )
+        self.collection = self._open_collection()
 
     def get_collection_count(self) -> int:
         """